@@ -1,5 +1,6 @@
-import chess, chess.engine
-from fastapi import FastAPI, HTTPException
+import asyncio, chess, chess.engine
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 # Modular Imports
@@ -12,7 +13,15 @@ from api.logic.engine import StockfishManager
 from api.logic.classifier import MoveClassifier
 from api.logic.analyzer import GameAnalyzer
 
-app = FastAPI(docs_url="/api/py/docs", openapi_url="/api/py/openapi.json")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _warmup_task
+    # Download/resolve Stockfish in the background so startup isn't blocked on it
+    _warmup_task = asyncio.create_task(_warmup())
+    yield
+    _stockfish_manager.shutdown()
+
+app = FastAPI(docs_url="/api/py/docs", openapi_url="/api/py/openapi.json", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,45 +34,86 @@ app.add_middleware(
 
 load_openings()
 _stockfish_manager = StockfishManager()
+# One shared game token for /eval. A fresh token per request makes python-chess send
+# ucinewgame, which wipes the engine's hash before every lookup. Hash entries are
+# keyed by position, so they stay valid between unrelated requests. An engine that
+# was last used by /analyze still clears its hash once when it switches over.
+_EVAL_GAME = object()
 _move_classifier = MoveClassifier()
 _analyzer = GameAnalyzer(_stockfish_manager, _move_classifier)
 
+_warmup_task: asyncio.Task | None = None
+
+async def _warmup():
+    try:
+        await asyncio.to_thread(_stockfish_manager.warmup)
+    except Exception as e:
+        # Requests fall back to resolving Stockfish lazily
+        print(f"Stockfish warmup failed: {e}")
+
+
+# How long a request waits on an in-flight warmup; stays under vercel.json's maxDuration
+WARMUP_WAIT_SECONDS = 40
+
+async def _stockfish_ready():
+    """Holds a request until the startup warmup finishes, answering 503 only if it takes too long."""
+    if _warmup_task is None or _warmup_task.done():
+        return
+    try:
+        await asyncio.wait_for(asyncio.shield(_warmup_task), timeout=WARMUP_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Stockfish is starting up", headers={"Retry-After": "5"})
+
 # ── Endpoints ─────────────────────────────────────────────────────────────────
 
-@app.post("/api/py/eval", response_model=EvalResponse)
+@app.post("/api/py/eval", response_model=EvalResponse, dependencies=[Depends(_stockfish_ready)])
 def evaluate_endpoint(req: EvalRequest):
+    # Parse and validate before borrowing an engine: Stockfish can crash or hang on
+    # positions that parse but are illegal (no kings, side not to move in check, ...)
+    try:
+        board = chess.Board(req.fen)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid FEN: {e}")
+    if not board.is_valid():
+        raise HTTPException(status_code=400, detail=f"Illegal position: {board.status().name}")
     try:
         with _stockfish_manager.get_engine() as engine:
-            board = chess.Board(req.fen)
-            info = engine.analyse(board, chess.engine.Limit(depth=req.depth), multipv=req.multipv)
-            
-            if isinstance(info, list):
-                pv_lines = []
-                for line in info:
-                    score = line.get("score")
-                    cp = score.white().score(mate_score=10000) if score else 0
-                    evaluation = cp if req.normalise_flag or board.turn == chess.WHITE else -cp
-                    pv_moves = [m.uci() for m in line.get("pv", [])]
-                    pv_lines.append(PVLine(evaluation=evaluation, moves=pv_moves))
-                return EvalResponse(
-                    evaluation=pv_lines[0].evaluation if pv_lines else 0,
-                    bestMove=pv_lines[0].moves[0] if pv_lines and pv_lines[0].moves else None,
-                    pvLines=pv_lines
-                )
-            else:
-                score = info.get("score")
+            info = engine.analyse(board, chess.engine.Limit(depth=req.depth), multipv=req.multipv, game=_EVAL_GAME)
+
+        if isinstance(info, list):
+            pv_lines = []
+            for line in info:
+                score = line.get("score")
                 cp = score.white().score(mate_score=10000) if score else 0
                 evaluation = cp if req.normalise_flag or board.turn == chess.WHITE else -cp
-                pv = info.get("pv")
-                return EvalResponse(evaluation=evaluation, bestMove=pv[0].uci() if pv else None)
+                pv_moves = [m.uci() for m in line.get("pv", [])]
+                pv_lines.append(PVLine(evaluation=evaluation, moves=pv_moves))
+            return EvalResponse(
+                evaluation=pv_lines[0].evaluation if pv_lines else 0,
+                bestMove=pv_lines[0].moves[0] if pv_lines and pv_lines[0].moves else None,
+                pvLines=pv_lines
+            )
+        else:
+            score = info.get("score")
+            cp = score.white().score(mate_score=10000) if score else 0
+            evaluation = cp if req.normalise_flag or board.turn == chess.WHITE else -cp
+            pv = info.get("pv")
+            return EvalResponse(evaluation=evaluation, bestMove=pv[0].uci() if pv else None)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Stockfish error: {e}")
 
 
-@app.post("/api/py/analyze", response_model=AnalyzeResponse)
+@app.post("/api/py/analyze", response_model=AnalyzeResponse, dependencies=[Depends(_stockfish_ready)])
 def analyze_endpoint(req: AnalyzeRequest):
     try:
-        return _analyzer.analyze(req.pgn, req.depth)
+        result = _analyzer.analyze(req.pgn, req.depth)
+        # The analyzer builds the response itself, so serialize it straight to JSON
+        # instead of letting FastAPI re-validate every move against response_model.
+        return Response(content=result.model_dump_json(), media_type="application/json")
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         error_msg = traceback.format_exc()
@@ -73,7 +123,13 @@ def analyze_endpoint(req: AnalyzeRequest):
 
 @app.get("/api/py/health")
 def health():
+    # Report warmup progress instead of waiting on it
+    if _warmup_task is not None and not _warmup_task.done():
+        raise HTTPException(
+            status_code=503, headers={"Retry-After": "5"},
+            detail={"status": "starting", **_stockfish_manager.status()},
+        )
     try:
-        return {"status": "ok", "stockfish": _stockfish_manager.resolve()}
+        return {"status": "ok", "stockfish": _stockfish_manager.resolve(revalidate=True)}
     except RuntimeError as e:
         raise HTTPException(status_code=503, detail=str(e))
@@ -1,7 +1,8 @@
 import io, chess, chess.pgn, chess.engine
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import HTTPException
 from api.models import AnalyzeResponse, MoveResult
-from api.utils import Utility, OPENING_BOOKS
+from api.utils import Utility, OPENING_BOOKS, BOOK_HASH_INIT
 from api.logic.engine import StockfishManager
 from api.logic.classifier import MoveClassifier
 from api.logic.metrics import PlayerMetrics
@@ -12,25 +13,36 @@ class GameAnalyzer:
     def __init__(self, stockfish: StockfishManager, classifier: MoveClassifier):
         self.stockfish = stockfish
         self.classifier = classifier
+        # One worker per pooled engine; each worker borrows its own engine per chunk
+        self._executor = ThreadPoolExecutor(max_workers=stockfish.pool_size, thread_name_prefix="analyse")
 
     def analyze(self, pgn_text: str, depth: int) -> AnalyzeResponse:
         game = self._parse_pgn(pgn_text)
         headers = game.headers
-        clocks = Utility.extract_clocks(pgn_text)
         
-        moves_list = list(game.mainline_moves())
         board = chess.Board()
-        fens = [board.fen()]
-        sans, ucis, is_whites = [], [], []
+        boards = [board.copy(stack=False)]
+        sans, ucis, is_whites, clocks = [], [], [], []
         
-        for mv in moves_list:
+        # Single walk over the parsed mainline. node.san() would replay the game from the
+        # root for every node, so SAN comes from the running board via san_and_push.
+        for node in game.mainline():
+            mv = node.move
             is_whites.append(board.turn == chess.WHITE)
-            sans.append(board.san(mv))
             ucis.append(mv.uci())
-            board.push(mv)
-            fens.append(board.fen())
+            sans.append(board.san_and_push(mv))
+            boards.append(board.copy(stack=False))
+            clocks.append(Utility.format_clock(node.clock()))
+        fens = [b.fen() for b in boards]
+        book_depth = self._book_depth(sans)
 
-        evals = self._run_engine_batch(fens, depth)
+        # Book positions are never searched; their evals are placeholders and are
+        # reported as None rather than as a 0.00 evaluation.
+        evals = [(0, None, [])] * book_depth
+        evals += self._run_engine_batch(boards[book_depth:], fens[book_depth:], depth)
+        # Win probability of each position from (White's, Black's) side, computed once
+        # per position rather than per lookup.
+        wps = [(self.classifier.get_win_prob(cp), self.classifier.get_win_prob(-cp)) for cp, _, _ in evals]
         
         white_elo = headers.get("WhiteElo", "1500")
         black_elo = headers.get("BlackElo", "1500")
@@ -38,19 +50,33 @@ class GameAnalyzer:
         black_metrics = PlayerMetrics(int(black_elo) if black_elo.isdigit() else 1500)
         
         results = []
-        for i in range(len(moves_list)):
+        for i in range(len(sans)):
             is_white = is_whites[i]
             best_cp_before, bm_before, alt_evals = evals[i]
             actual_cp_after, _, _ = evals[i+1]
+            is_sac = self._is_sacrifice(i, is_white, boards)
+            phase = self._get_phase(boards[i], i // 2 + 1)
+
+            if i < book_depth:
+                m = white_metrics if is_white else black_metrics
+                m.add_move(0.0, 0, "Book", phase)
+                results.append(MoveResult.model_construct(
+                    san=sans[i], uci=ucis[i], fen=fens[i+1], fenBefore=fens[i],
+                    evaluation=actual_cp_after if i + 1 >= book_depth else None,
+                    cpLoss=None, wpl=0.0, classification="Book",
+                    clock=clocks[i],
+                    isWhite=is_white, moveNumber=i // 2 + 1,
+                    isSacrifice=is_sac, phase=phase
+                ))
+                continue
             
-            wp_start = self.classifier.get_win_prob(best_cp_before if is_white else -best_cp_before)
-            wp_after = self.classifier.get_win_prob(actual_cp_after if is_white else -actual_cp_after)
+            side = 0 if is_white else 1
+            wp_start = wps[i][side]
+            wp_after = wps[i+1][side]
             
-            opp_blundered = self._was_opponent_blunder(i, is_white, evals)
+            opp_blundered = i > book_depth and self._was_opponent_blunder(i, is_white, wps)
             is_only = self._is_only_move(wp_start, is_white, alt_evals)
-            is_sac = self._is_sacrifice(i, is_white, fens)
             
-            phase = self._get_phase(fens[i], i // 2 + 1)
             cp_best = best_cp_before if is_white else -best_cp_before
             cp_after_mover = actual_cp_after if is_white else -actual_cp_after
             
@@ -59,22 +85,18 @@ class GameAnalyzer:
                 (ucis[i] == bm_before), is_sac, is_only, opp_blundered, phase
             )
 
-            # Book detection
-            if tuple(sans[:i+1]) in OPENING_BOOKS:
-                cls = "Book"
-
             m = white_metrics if is_white else black_metrics
             cp_loss = max(0, cp_best - cp_after_mover)
-            wpl = max(0.0, wp_start - wp_after) if cls != "Book" else 0.0
+            wpl = max(0.0, wp_start - wp_after)
             
             m.add_move(wpl, cp_loss, cls, phase)
             
             show_best = cls in ("Inaccuracy", "Mistake", "Miss", "Blunder", "Great", "Excellent")
-            results.append(MoveResult(
+            results.append(MoveResult.model_construct(
                 san=sans[i], uci=ucis[i], fen=fens[i+1], fenBefore=fens[i],
                 evaluation=actual_cp_after, cpLoss=cp_loss, wpl=wpl,
                 classification=cls, bestMoveUci=bm_before if show_best else None,
-                clock=clocks[i] if i < len(clocks) else None,
+                clock=clocks[i],
                 isWhite=is_white, moveNumber=i // 2 + 1,
                 isOnlyMove=is_only, isSacrifice=is_sac, phase=phase
             ))
@@ -82,15 +104,15 @@ class GameAnalyzer:
         w_acc = white_metrics.calculate_accuracy()
         b_acc = black_metrics.calculate_accuracy()
 
-        return AnalyzeResponse(
+        return AnalyzeResponse.model_construct(
             pgn=pgn_text, accuracy=(w_acc + b_acc) / 2,
             whiteAccuracy=w_acc, blackAccuracy=b_acc,
             whitePhaseAccuracy=white_metrics.get_phase_accuracies(),
             blackPhaseAccuracy=black_metrics.get_phase_accuracies(),
             whiteRating=white_metrics.estimate_rating(),
             blackRating=black_metrics.estimate_rating(),
-            whiteClassifications=white_metrics.cls,
-            blackClassifications=black_metrics.cls,
+            whiteClassifications=white_metrics.get_classifications(),
+            blackClassifications=black_metrics.get_classifications(),
             whitePlayer=headers.get("White", "White"), blackPlayer=headers.get("Black", "Black"),
             whiteElo=white_elo, blackElo=black_elo,
             timeControl=headers.get("TimeControl", "—"), moves=results
@@ -101,33 +123,61 @@ class GameAnalyzer:
         if not game: raise HTTPException(status_code=400, detail="Could not parse PGN")
         return game
 
-    def _run_engine_batch(self, fens: list[str], depth: int) -> list[tuple[int, str | None, list[int]]]:
-        evals = []
+    def _run_engine_batch(self, boards: list[chess.Board], fens: list[str], depth: int) -> list[tuple[int, str | None, list[int]]]:
+        # Repeated positions (ignoring move counters) are searched once. The final position
+        # only feeds the last move's eval, so it needs no second line for the only-move check.
+        keys = [" ".join(fen.split()[:4]) for fen in fens]
+        unique: dict[str, chess.Board] = {}
+        for key, board in zip(keys, boards):
+            unique.setdefault(key, board)
+        jobs = [(board, 2) for board in unique.values()]
+        if keys[-1] not in keys[:-1]:
+            jobs[-1] = (boards[-1], 1)
+
+        # Split into contiguous chunks, one per pooled engine, so consecutive plies
+        # still share a transposition table while chunks search in parallel.
+        k = max(1, min(len(jobs), self.stockfish.pool_size))
+        size = -(-len(jobs) // k)
+        chunks = [jobs[j:j + size] for j in range(0, len(jobs), size)]
+        game = object()  # one ucinewgame per request
         try:
-            with self.stockfish.get_engine() as engine:
-                for fen in fens:
-                    board = chess.Board(fen)
-                    info = engine.analyse(board, chess.engine.Limit(depth=depth), multipv=3)
-                    if isinstance(info, list):
-                        top_cp = info[0].get("score").white().score(mate_score=10000) or 0
-                        bm = info[0].get("pv")[0].uci() if info[0].get("pv") else None
-                        others = [it.get("score").white().score(mate_score=10000) or 0 for it in info[1:]]
-                        evals.append((top_cp, bm, others))
-                    else:
-                        cp = info.get("score").white().score(mate_score=10000) or 0
-                        pv = info.get("pv")
-                        evals.append((cp, pv[0].uci() if pv else None, []))
-            return evals
+            results = list(self._executor.map(lambda chunk: self._analyse_chunk(chunk, depth, game), chunks))
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Engine analysis failed: {e}")
+        eval_cache = dict(zip(unique, (ev for chunk_evals in results for ev in chunk_evals)))
+        return [eval_cache[key] for key in keys]
+
+    def _analyse_chunk(self, jobs: list[tuple[chess.Board, int]], depth: int, game: object) -> list[tuple[int, str | None, list[int]]]:
+        evals = []
+        with self.stockfish.get_engine() as engine:
+            for board, multipv in jobs:
+                info = engine.analyse(board, chess.engine.Limit(depth=depth), multipv=multipv, game=game)
+                if isinstance(info, list):
+                    top_cp = info[0].get("score").white().score(mate_score=10000) or 0
+                    bm = info[0].get("pv")[0].uci() if info[0].get("pv") else None
+                    others = [it.get("score").white().score(mate_score=10000) or 0 for it in info[1:]]
+                    evals.append((top_cp, bm, others))
+                else:
+                    cp = info.get("score").white().score(mate_score=10000) or 0
+                    pv = info.get("pv")
+                    evals.append((cp, pv[0].uci() if pv else None, []))
+        return evals
+
+    def _book_depth(self, sans: list[str]) -> int:
+        """Number of leading plies that follow a known opening line."""
+        depth, h = 0, BOOK_HASH_INIT
+        for san in sans:
+            h = Utility.book_hash(h, san)
+            if h not in OPENING_BOOKS:
+                break
+            depth += 1
+        return depth
 
-    def _was_opponent_blunder(self, i: int, is_white: bool, evals: list) -> bool:
+    def _was_opponent_blunder(self, i: int, is_white: bool, wps: list[tuple[float, float]]) -> bool:
         if i == 0: return False
-        prev_is_white = not is_white
-        prev_best_cp, _, _ = evals[i-1]
-        prev_actual_cp, _, _ = evals[i]
-        prev_wp_start = self.classifier.get_win_prob(prev_best_cp if prev_is_white else -prev_best_cp)
-        prev_wp_after = self.classifier.get_win_prob(prev_actual_cp if prev_is_white else -prev_actual_cp)
+        prev_side = 1 if is_white else 0
+        prev_wp_start = wps[i-1][prev_side]
+        prev_wp_after = wps[i][prev_side]
         return (prev_wp_start - prev_wp_after) >= 0.07
 
     def _is_only_move(self, wp_start: float, is_white: bool, alt_evals: list[int]) -> bool:
@@ -135,15 +185,14 @@ class GameAnalyzer:
         best_alt_wp = self.classifier.get_win_prob(alt_evals[0] if is_white else -alt_evals[0])
         return (wp_start - best_alt_wp) > 0.25
 
-    def _is_sacrifice(self, i: int, is_white: bool, fens: list[str]) -> bool:
-        mat_before = Utility.material_balance(chess.Board(fens[i]), is_white)
-        if i + 2 < len(fens):
-            mat_after = Utility.material_balance(chess.Board(fens[i+2]), is_white)
+    def _is_sacrifice(self, i: int, is_white: bool, boards: list[chess.Board]) -> bool:
+        mat_before = Utility.material_balance(boards[i], is_white)
+        if i + 2 < len(boards):
+            mat_after = Utility.material_balance(boards[i+2], is_white)
             return mat_after <= mat_before - 2
         return False
 
-    def _get_phase(self, fen: str, move_num: int) -> str:
-        b = chess.Board(fen)
+    def _get_phase(self, b: chess.Board, move_num: int) -> str:
         w_mat = sum({chess.KNIGHT: 3, chess.BISHOP: 3, chess.ROOK: 5, chess.QUEEN: 9}.get(p.piece_type, 0) for p in b.piece_map().values() if p.color == chess.WHITE)
         b_mat = sum({chess.KNIGHT: 3, chess.BISHOP: 3, chess.ROOK: 5, chess.QUEEN: 9}.get(p.piece_type, 0) for p in b.piece_map().values() if p.color == chess.BLACK)
         if w_mat <= 13 and b_mat <= 13: return "endgame"
@@ -1,5 +1,15 @@
+import bisect
+
 class MoveClassifier:
     """Production-grade move classification using WPL and CP metrics."""
+
+    # Upper WPL bound (inclusive) of each standard bucket, per phase; anything above is a Blunder.
+    BUCKET_LABELS = ("Best", "Excellent", "Good", "Inaccuracy", "Mistake", "Blunder")
+    PHASE_BUCKETS = {
+        "opening":    (0.002, 0.015, 0.04, 0.06, 0.15),
+        "middlegame": (0.002, 0.015, 0.04, 0.08, 0.22),
+        "endgame":    (0.002, 0.015, 0.04, 0.05, 0.12),
+    }
     
     @staticmethod
     def get_win_prob(cp: int) -> float:
@@ -41,17 +51,6 @@ class MoveClassifier:
         if (was_winning and wp_after < 0.65) or (opponent_blundered and wpl > 0.10):
             return "Miss"
 
-        # 5. Standard Buckets (Phase Aware)
-        inacc, mistake = self._get_thresholds(phase)
-
-        if wpl <= 0.002: return "Best"
-        if wpl <= 0.015: return "Excellent"
-        if wpl <= 0.04:  return "Good"
-        if wpl <= inacc: return "Inaccuracy"
-        if wpl <= mistake: return "Mistake"
-        return "Blunder"
-
-    def _get_thresholds(self, phase: str) -> tuple[float, float]:
-        if phase == "opening": return 0.06, 0.15
-        if phase == "middlegame": return 0.08, 0.22
-        return 0.05, 0.12  # endgame
+        # 5. Standard Buckets (Phase Aware): first bound with wpl <= bound
+        bounds = self.PHASE_BUCKETS.get(phase, self.PHASE_BUCKETS["endgame"])
+        return self.BUCKET_LABELS[bisect.bisect_left(bounds, wpl)]
@@ -1,5 +1,29 @@
-import os, shutil, stat, urllib.request, tarfile, tempfile, chess.engine
-from typing import Optional
+import os, queue, hashlib, shutil, stat, threading, urllib.request, tarfile, tempfile, chess.engine
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+class _HashingReader:
+    """Read-only file wrapper that hashes everything read through it."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        self.sha256.update(data)
+        self.bytes_read += len(data)
+        return data
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 
 class StockfishManager:
     """Manages Stockfish engine lifecycle, including downloading and resolution."""
@@ -7,15 +31,42 @@ class StockfishManager:
     URL = "https://github.com/official-stockfish/Stockfish/releases/download/sf_16.1/stockfish-ubuntu-x86-64-avx2.tar"
     TMP_DIR = tempfile.gettempdir()
     TMP_BIN = os.path.join(TMP_DIR, "stockfish_sf16")
+    # SHA-256 of the archive at URL. Not pinned yet: set it to the digest published for the
+    # sf_16.1 release asset. STOCKFISH_SHA256 overrides it.
+    ARCHIVE_SHA256: Optional[str] = None
+    MAX_POOL_SIZE = 4
+    # Total transposition-table budget, shared out across the pool
+    HASH_MB = int(os.getenv("STOCKFISH_HASH_MB", 256))
 
-    def __init__(self):
+    def __init__(self, pool_size: Optional[int] = None):
         self._path: Optional[str] = None
+        self._cores = self._usable_cores()
+        self.pool_size = pool_size or int(os.getenv("STOCKFISH_POOL_SIZE", 0)) or min(self._cores, self.MAX_POOL_SIZE)
+        self._idle: "queue.Queue[chess.engine.SimpleEngine]" = queue.Queue()
+        self._spawned = 0
+        self._lock = threading.Lock()
+        self._resolve_lock = threading.Lock()
+        self.stage = "idle"
+        self._download: Optional[_HashingReader] = None
+
+    def resolve(self, revalidate: bool = False) -> str:
+        """Finds or downloads Stockfish binary.
 
-    def resolve(self) -> str:
-        """Finds or downloads Stockfish binary."""
-        if self._path and os.path.isfile(self._path):
+        Once found, the path is trusted without touching the filesystem again; pass
+        ``revalidate=True`` (as /health does) to re-check that it still exists.
+        """
+        if self._path and not revalidate:
             return self._path
-            
+        # Serialized so a request racing the startup warmup doesn't start a second download
+        with self._resolve_lock:
+            if self._path and not os.path.isfile(self._path):
+                self._path = None
+            return self._resolve()
+
+    def _resolve(self) -> str:
+        if self._path:
+            return self._path
+
         local_windows_exe = os.path.join(os.path.dirname(os.path.dirname(__file__)), "stockfish16.exe")
         if os.path.isfile(local_windows_exe):
             self._path = local_windows_exe
@@ -40,35 +91,153 @@ class StockfishManager:
 
     def _download_and_extract(self) -> Optional[str]:
         """Download and extract Stockfish 16.1 if not present (Linux Vercel)."""
+        digest_path = self.TMP_BIN + ".sha256"
         if os.path.isfile(self.TMP_BIN):
-            return self.TMP_BIN
+            # Reuse a cached binary only if it still matches the digest recorded at install
+            if os.path.isfile(digest_path):
+                with open(digest_path) as f:
+                    if f.read().strip() == _file_sha256(self.TMP_BIN):
+                        return self.TMP_BIN
+            print("Cached Stockfish binary failed its integrity check, re-downloading")
 
         print(f"Downloading Stockfish 16.1 to {self.TMP_DIR}...")
-        tar_path = os.path.join(self.TMP_DIR, "sf16.tar")
+        self.stage = "downloading"
+        part_path = self.TMP_BIN + ".part"
+        expected = os.getenv("STOCKFISH_SHA256") or self.ARCHIVE_SHA256
         try:
-            urllib.request.urlretrieve(self.URL, tar_path)
-            with tarfile.open(tar_path) as tar:
-                tar.extractall(path=self.TMP_DIR)
-                
-            extracted_binary = None
-            for root, _, files in os.walk(self.TMP_DIR):
-                for f in files:
-                    if (f == "stockfish" or f.startswith("stockfish-ubuntu-x86-64")) and not f.endswith(".tar"):
-                        extracted_binary = os.path.join(root, f)
-                        break
-                if extracted_binary: break
-
-            if extracted_binary:
-                if os.path.exists(self.TMP_BIN): os.remove(self.TMP_BIN)
-                shutil.move(extracted_binary, self.TMP_BIN)
-                os.chmod(self.TMP_BIN, stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP)
-                print(f"Stockfish 16.1 setup successful: {self.TMP_BIN}")
-            
-            if os.path.exists(tar_path): os.unlink(tar_path)
-            return self.TMP_BIN if os.path.isfile(self.TMP_BIN) else None
+            # Stream the archive straight from the response and copy out only the binary
+            with urllib.request.urlopen(self.URL) as resp:
+                src = self._download = _HashingReader(resp)
+                found = False
+                with tarfile.open(fileobj=src, mode="r|*") as tar:
+                    for member in tar:
+                        name = os.path.basename(member.name)
+                        if member.isfile() and (name == "stockfish" or name.startswith("stockfish-ubuntu-x86-64")) and not name.endswith(".tar"):
+                            with tar.extractfile(member) as f, open(part_path, "wb") as dst:
+                                shutil.copyfileobj(f, dst, length=1 << 20)
+                            found = True
+                            break
+                if not found:
+                    print("Stockfish binary not found in archive")
+                    return None
+                if expected:
+                    while src.read(1 << 20):  # the checksum covers the whole archive
+                        pass
+
+            if expected and src.sha256.hexdigest() != expected.lower():
+                print(f"Stockfish archive checksum mismatch: {src.sha256.hexdigest()}")
+                os.unlink(part_path)
+                return None
+            # chmod before the rename so TMP_BIN only ever appears complete and executable
+            os.chmod(part_path, stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP)
+            os.replace(part_path, self.TMP_BIN)
+            with open(digest_path, "w") as f:
+                f.write(_file_sha256(self.TMP_BIN))
+            print(f"Stockfish 16.1 setup successful: {self.TMP_BIN}")
+            return self.TMP_BIN
         except Exception as e:
             print(f"Error setting up Stockfish: {e}")
+            if os.path.exists(part_path): os.unlink(part_path)
             return None
+        finally:
+            self._download = None
 
-    def get_engine(self) -> chess.engine.SimpleEngine:
-        return chess.engine.SimpleEngine.popen_uci(self.resolve())
+    @contextmanager
+    def get_engine(self) -> Iterator[chess.engine.SimpleEngine]:
+        """Borrows a warm engine from the pool, spawning one lazily if the pool isn't full yet.
+
+        Callers pass a fresh ``game`` token to ``analyse`` so python-chess sends ``ucinewgame``
+        once per request. Only an engine that failed (or was interrupted mid-search) is
+        discarded; errors raised by the caller's own code hand it back to the pool.
+        """
+        engine = self._acquire()
+        healthy = False
+        try:
+            yield engine
+            healthy = True
+        except (chess.engine.EngineError, TimeoutError):
+            raise
+        except Exception:
+            healthy = True
+            raise
+        finally:
+            if healthy:
+                self._idle.put(engine)
+            else:
+                self._discard(engine)
+
+    def warmup(self) -> None:
+        """Spawns one engine up front so the first request skips the UCI handshake."""
+        self.stage = "resolving"
+        try:
+            self.resolve()
+            self.stage = "starting engine"
+            with self.get_engine():
+                pass
+        except Exception:
+            self.stage = "failed"
+            raise
+        self.stage = "ready"
+
+    def status(self) -> dict:
+        """Warmup progress, as reported by /health."""
+        download = self._download
+        return {"stage": self.stage, "downloadedBytes": download.bytes_read if download else None}
+
+    def shutdown(self) -> None:
+        while True:
+            try:
+                engine = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(engine)
+
+    def _acquire(self) -> chess.engine.SimpleEngine:
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                spawn = self._spawned < self.pool_size
+                if spawn:
+                    self._spawned += 1
+            if spawn:
+                try:
+                    return self._spawn()
+                except Exception:
+                    with self._lock:
+                        self._spawned -= 1
+                    raise
+            # Pool is full: wait for an engine, re-checking in case a busy one was discarded.
+            try:
+                return self._idle.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+    def _spawn(self) -> chess.engine.SimpleEngine:
+        engine = chess.engine.SimpleEngine.popen_uci(self.resolve())
+        # Usable cores are split evenly across the pool. The default pool has one engine
+        # per core, so each engine searches with one thread. Engines only get more
+        # threads when STOCKFISH_POOL_SIZE is set below the core count.
+        # UCI_AnalyseMode is left alone: python-chess sets it on every analyse() call.
+        threads = max(1, self._cores // self.pool_size)
+        options = {"Threads": threads, "Hash": max(16, self.HASH_MB // self.pool_size)}
+        engine.configure({k: v for k, v in options.items() if k in engine.options})
+        return engine
+
+    @staticmethod
+    def _usable_cores() -> int:
+        """Cores this process may run on (cpu_count() reports the whole host inside containers)."""
+        try:
+            return len(os.sched_getaffinity(0)) or 1
+        except AttributeError:  # not available on Windows/macOS
+            return os.cpu_count() or 1
+
+    def _discard(self, engine: chess.engine.SimpleEngine) -> None:
+        with self._lock:
+            self._spawned -= 1
+        try:
+            engine.quit()
+        except Exception:
+            engine.close()
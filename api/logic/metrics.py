@@ -9,7 +9,10 @@ class PlayerMetrics:
         self.total_wpl = 0.0
         self.total_cp = 0
         self.count = 0
-        self.cls = ClassificationCount()
+        self.cls = {
+            "brilliant": 0, "great": 0, "best": 0, "excellent": 0, "good": 0,
+            "book": 0, "inaccuracy": 0, "mistake": 0, "miss": 0, "blunder": 0
+        }
         self.phases = {
             "opening": {"wpl": 0.0, "c": 0},
             "middlegame": {"wpl": 0.0, "c": 0},
@@ -18,8 +21,7 @@ class PlayerMetrics:
 
     def add_move(self, wpl: float, cp_loss: int, classification: str, phase: str):
         cls_key = classification.lower().replace(" ", "")
-        current = getattr(self.cls, cls_key, 0)
-        setattr(self.cls, cls_key, current + 1)
+        self.cls[cls_key] = self.cls.get(cls_key, 0) + 1
 
         if classification == "Book":
             return
@@ -54,6 +56,9 @@ class PlayerMetrics:
                 setattr(res, p, self.calculate_accuracy(stats["wpl"], stats["c"]))
         return res
 
+    def get_classifications(self) -> ClassificationCount:
+        return ClassificationCount(**self.cls)
+
     def estimate_rating(self) -> int:
         avg_cp = self.total_cp / self.count if self.count > 0 else 0
         if avg_cp <= 0: return 3000
@@ -25,8 +25,8 @@ class MoveResult(BaseModel):
     uci: str
     fen: str
     fenBefore: str
-    evaluation: int
-    cpLoss: int
+    evaluation: Optional[int] = None  # None for book moves, which aren't searched
+    cpLoss: Optional[int] = None
     wpl: float
     classification: str
     bestMoveUci: Optional[str] = None
@@ -1,7 +1,14 @@
-import os, re, glob, chess
-from typing import Set, Tuple
+import os, re, sys, glob, mmap, chess
+from typing import Optional, Set
 
-OPENING_BOOKS: Set[Tuple[str, ...]] = set()
+# Every opening-line prefix, stored as a 64-bit FNV-style rolling hash of its SAN moves.
+# Filled in place by load_openings() since other modules import the set directly.
+OPENING_BOOKS: Set[int] = set()
+BOOK_HASH_INIT = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+_MASK64 = (1 << 64) - 1
+_MOVE_NUM_RE = re.compile(rb'\d+\.+')
+_RESULT_TOKENS = frozenset((b"1-0", b"0-1", b"1/2-1/2", b"*"))
 
 def load_openings():
     base_dir = os.path.dirname(os.path.dirname(__file__))
@@ -10,25 +17,43 @@ def load_openings():
         return
 
     for path in glob.glob(os.path.join(openings_dir, "*.tsv")):
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                parts = line.split('\t')
+        if os.path.getsize(path) == 0:
+            continue
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                parts = line.split(b'\t', 3)
                 if len(parts) >= 3:
-                    pgn_str = parts[2].strip()
-                    clean_str = re.sub(r'\d+\.+', '', pgn_str)
-                    sans_raw = clean_str.split()
-                    parsed_sans = tuple(m for m in sans_raw if m not in ("1-0", "0-1", "1/2-1/2", "*"))
-                    for i in range(1, len(parsed_sans) + 1):
-                        OPENING_BOOKS.add(parsed_sans[:i])
+                    h = BOOK_HASH_INIT
+                    for tok in _MOVE_NUM_RE.sub(b'', parts[2]).split():
+                        if tok in _RESULT_TOKENS:
+                            continue
+                        # Interned so repeated moves share one str and its cached hash
+                        h = Utility.book_hash(h, sys.intern(tok.decode("utf-8")))
+                        OPENING_BOOKS.add(h)
 
 class Utility:
+    @staticmethod
+    def book_hash(h: int, san: str) -> int:
+        """Extends a move-sequence hash by one SAN move."""
+        return ((h ^ hash(san)) * _FNV_PRIME) & _MASK64
+
     @staticmethod
     def material_balance(board: chess.Board, for_white: bool) -> int:
-        PIECE_VALUES = {'p': 1, 'n': 3, 'b': 3, 'r': 5, 'q': 9, 'k': 0}
-        w = sum(PIECE_VALUES.get(p.symbol().lower(), 0) for p in board.piece_map().values() if p.color == chess.WHITE)
-        b = sum(PIECE_VALUES.get(p.symbol().lower(), 0) for p in board.piece_map().values() if p.color == chess.BLACK)
+        # Popcount the piece bitboards instead of walking piece_map().
+        def side(occ: int) -> int:
+            return ((board.pawns & occ).bit_count()
+                    + 3 * ((board.knights | board.bishops) & occ).bit_count()
+                    + 5 * (board.rooks & occ).bit_count()
+                    + 9 * (board.queens & occ).bit_count())
+        w, b = side(board.occupied_co[chess.WHITE]), side(board.occupied_co[chess.BLACK])
         return (w - b) if for_white else (b - w)
 
     @staticmethod
-    def extract_clocks(pgn_text: str) -> list[str]:
-        return re.findall(r'\[%clk\s+([\d:.]+)\]', pgn_text)
+    def format_clock(seconds: Optional[float]) -> Optional[str]:
+        """Formats a [%clk] comment value back to H:MM:SS (with tenths if present)."""
+        if seconds is None:
+            return None
+        whole, tenths = divmod(round(seconds * 10), 10)
+        h, rem = divmod(whole, 3600)
+        m, s = divmod(rem, 60)
+        return f"{h}:{m:02d}:{s:02d}" + (f".{tenths}" if tenths else "")
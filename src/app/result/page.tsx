@@ -878,7 +878,7 @@ export default function ResultPage() {
                               fontSize: 13, fontWeight: 700, flexShrink: 0,
                               background: 'var(--score-white)', color: 'var(--score-black)',
                             }}>
-                              {formatEvalStr(playedMove.evaluation)}
+                              {playedMove.evaluation === null ? 'Book' : formatEvalStr(playedMove.evaluation)}
                             </div>
                             <div style={{ width: 16, height: 16, flexShrink: 0 }}>
                               {svg && <img src={svg} alt={playedMove.classification} style={{ width: 16, height: 16 }} />}
@@ -47,7 +47,7 @@ export default function CoachSection({ move, evaluation, onNext, onBestMove }: C
     };
 
     const formatEval = (val: number | null) => {
-        if (val === null) return '0.0';
+        if (val === null) return '–';  // book position, not searched
         if (Math.abs(val) > 900) return (val > 0 ? '+M' : '-M') + (1000 - Math.abs(val));
         return (val > 0 ? '+' : '') + (val / 100).toFixed(1);
     };
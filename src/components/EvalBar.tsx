@@ -3,7 +3,7 @@
 import { useMemo } from 'react';
 
 interface Props {
-    evaluation: number;  // centipawns, positive = white better
+    evaluation: number | null;  // centipawns, positive = white better; null = book (not searched)
     flipped?: boolean;
 }
 
@@ -27,10 +27,12 @@ function formatEval(cp: number): string {
 
 export default function EvalBar({ evaluation, flipped = false }: Props) {
     const { heightPct, display, whiteOnTop } = useMemo(() => ({
-        heightPct: evalToHeightPct(evaluation),
-        display: formatEval(evaluation),
+        // Unsearched book positions: keep the bar centred and label it "–" rather than 0.0
+        heightPct: evaluation === null ? 50 : evalToHeightPct(evaluation),
+        display: evaluation === null ? '–' : formatEval(evaluation),
         whiteOnTop: flipped,    // when flipped, white is at top
     }), [evaluation, flipped]);
+    const whiteAhead = (evaluation ?? 0) >= 0;
 
     // White fill: from bottom normally, from top when flipped
     const whiteHeight = `${heightPct}%`;
@@ -63,7 +65,7 @@ export default function EvalBar({ evaluation, flipped = false }: Props) {
             }} />
 
             {/* Advantage number — shown on the advantaged side */}
-            {evaluation >= 0 && !whiteOnTop && (
+            {whiteAhead && !whiteOnTop && (
                 <span style={{
                     position: 'absolute', bottom: 5, left: 0, width: '100%',
                     textAlign: 'center', fontSize: 11, fontWeight: 'bold', color: '#000', zIndex: 2
@@ -71,7 +73,7 @@ export default function EvalBar({ evaluation, flipped = false }: Props) {
                     {display}
                 </span>
             )}
-            {evaluation >= 0 && whiteOnTop && (
+            {whiteAhead && whiteOnTop && (
                 <span style={{
                     position: 'absolute', top: 5, left: 0, width: '100%',
                     textAlign: 'center', fontSize: 11, fontWeight: 'bold', color: '#000', zIndex: 2
@@ -79,7 +81,7 @@ export default function EvalBar({ evaluation, flipped = false }: Props) {
                     {display}
                 </span>
             )}
-            {evaluation < 0 && !whiteOnTop && (
+            {!whiteAhead && !whiteOnTop && (
                 <span style={{
                     position: 'absolute', top: 5, left: 0, width: '100%',
                     textAlign: 'center', fontSize: 11, fontWeight: 'bold', color: '#fff', zIndex: 2
@@ -87,7 +89,7 @@ export default function EvalBar({ evaluation, flipped = false }: Props) {
                     {display}
                 </span>
             )}
-            {evaluation < 0 && whiteOnTop && (
+            {!whiteAhead && whiteOnTop && (
                 <span style={{
                     position: 'absolute', bottom: 5, left: 0, width: '100%',
                     textAlign: 'center', fontSize: 11, fontWeight: 'bold', color: '#fff', zIndex: 2
@@ -11,7 +11,7 @@ import { useRef } from 'react';
 ChartJS.register(CategoryScale, LinearScale, PointElement, LineElement, Title, Tooltip, Filler);
 
 interface Props {
-    evaluations: number[]; // index 0 = start pos, i = after move i
+    evaluations: (number | null)[]; // index 0 = start pos, i = after move i; null = book (not searched)
     currentIndex: number;
     onSelectMove: (index: number) => void;
 }
@@ -23,7 +23,8 @@ export default function EvalChart({ evaluations, currentIndex, onSelectMove }: P
         labels: evaluations.map((_, i) => i),
         datasets: [{
             label: 'Evaluation',
-            data: evaluations.map(e => Math.max(-10, Math.min(10, e / 100))),
+            data: evaluations.map(e => (e === null ? null : Math.max(-10, Math.min(10, e / 100)))),
+            spanGaps: false,
             borderColor: '#ffffff',
             borderWidth: 2,
             pointRadius: 0,
@@ -54,7 +55,8 @@ export default function EvalChart({ evaluations, currentIndex, onSelectMove }: P
                 borderColor: 'var(--review-border-strong)', borderWidth: 1,
                 callbacks: {
                     label: (c) => {
-                        const v = c.parsed.y ?? 0;
+                        if (c.parsed.y === null) return 'Book';
+                        const v = c.parsed.y;
                         return `Eval: ${v > 0 ? '+' : ''}${v.toFixed(2)}`;
                     },
                 },
@@ -16,7 +16,8 @@ export function useChessGame(data: AnalyzeResponse | null) {
         [data],
     );
     const rawMoves: MoveResult[] = data?.moves ?? [];
-    const evaluations: number[] = useMemo(
+    // null = book position the engine didn't search; shown as a gap / "–", never as 0.00
+    const evaluations: (number | null)[] = useMemo(
         () => (data ? [0, ...data.moves.map(m => m.evaluation)] : [0]),
         [data],
     );
@@ -36,9 +37,9 @@ export function useChessGame(data: AnalyzeResponse | null) {
         ? (variationMoves[variationIndex]?.fen ?? mainFens[currentMoveIndex])
         : mainFens[currentMoveIndex];
 
-    const currentEval: number = isVariation
+    const currentEval: number | null = isVariation
         ? (variationMoves[variationIndex]?.eval ?? 0)
-        : (evaluations[currentMoveIndex] ?? 0);
+        : (evaluations[currentMoveIndex] ?? null);
 
     const currentMoveData: MoveResult | null =
         !isVariation && currentMoveIndex > 0
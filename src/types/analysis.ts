@@ -5,8 +5,8 @@ export interface MoveResult {
     uci: string;
     fen: string;
     fenBefore: string;
-    evaluation: number;   // centipawns, always from White's perspective
-    cpLoss: number;
+    evaluation: number | null;   // centipawns, always from White's perspective; null for book moves
+    cpLoss: number | null;
     classification: string; // "Brilliant" | "Best" | "Excellent" | "Good" | "Inaccuracy" | "Mistake" | "Miss" | "Blunder" | "Book"
     bestMoveUci: string | null;
     clock: string | null;